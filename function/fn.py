@@ -4,31 +4,152 @@ A Crossplane composition function that commits files directly to GitHub reposito
 using either personal access tokens or GitHub App authentication.
 """
 
+import asyncio
 import base64
+import collections
+import datetime
+import functools
+import gzip
+import hashlib
 import json
+import operator
+import os
+import threading
 import time
+import types
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple
 
 import grpc.aio
-import jwt
+import orjson
+import pybase64
 import requests
 from crossplane.function import logging
 from crossplane.function.proto.v1 import run_function_pb2 as fnv1
-from google.protobuf import json_format
-from kubernetes import client, config
-from kubernetes.client.rest import ApiException
+from google.protobuf import json_format, struct_pb2
+from requests.adapters import HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.util.retry import Retry
+
+# kubernetes, PyJWT and cryptography are slow to import and only needed for
+# secret references and GitHub App auth, so they are imported on first use
+if TYPE_CHECKING:
+    from kubernetes import client
 
 # Constants for HTTP status codes
 HTTP_OK = 200
 HTTP_CREATED = 201
+HTTP_NOT_MODIFIED = 304
 HTTP_NOT_FOUND = 404
+HTTP_CONFLICT = 409
+HTTP_UNPROCESSABLE_ENTITY = 422
 
 # Security: timeout for requests
 REQUEST_TIMEOUT = 30
 
+# Headers sent with every GitHub API request, shared read-only by all clients
+DEFAULT_HEADERS = types.MappingProxyType(
+    {
+        "Accept": "application/vnd.github.v3+json",
+        "User-Agent": "Crossplane-GitHub-Function",
+    }
+)
+
+# Access tokens whose request headers are kept; installation tokens rotate
+# hourly, so only recent ones are worth keeping
+AUTH_HEADERS_CACHE_SIZE = 64
+
+# Connection pool sizing for the GitHub API session: a pool per host (only
+# api.github.com in practice), each keeping enough connections for
+# concurrent commits
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+# Retry transient GitHub failures with exponential backoff, honoring Retry-After
+RETRY_TOTAL = 6
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+RETRY_METHODS = frozenset({"GET", "PUT", "POST", "PATCH"})
+
+# Concurrent commits per RunFunction call, to stay clear of GitHub's
+# secondary rate limits
+MAX_CONCURRENT_COMMITS = 8
+
+# GitHub GraphQL endpoint and the mutation committing several files at once
+GRAPHQL_URL = "https://api.github.com/graphql"
+CREATE_COMMIT_MUTATION = """
+mutation ($input: CreateCommitOnBranchInput!) {
+  createCommitOnBranch(input: $input) {
+    commit {
+      oid
+    }
+  }
+}
+"""
+
+# Client-side request budget: GitHub's primary limit of 5000 requests/hour,
+# with bursts of up to 100 requests
+RATE_LIMIT_PER_SECOND = 5000 / 3600
+RATE_LIMIT_BURST = 100
+# Below this many remaining requests, spread the rest until the window resets
+RATE_LIMIT_LOW_REMAINING = 100
+# Longest a request waits for the rate limit before failing instead; longer
+# waits would hold worker threads past any reasonable deadline
+RATE_LIMIT_MAX_WAIT = REQUEST_TIMEOUT
+
+# How file content is given: UTF-8 text, base64 text, or raw bytes (API only)
+ContentEncoding = Literal["utf8", "base64", "raw"]
+INPUT_CONTENT_ENCODINGS = ("utf8", "base64")
+
+# Gzip Contents API request bodies larger than this when uploads are compressed.
+# GitHub does not document compressed request bodies, so this is opt-in.
+COMPRESS_UPLOADS = os.environ.get("COMPRESS_UPLOADS", "false").lower() == "true"
+COMPRESS_MIN_BYTES = 4096
+COMPRESS_LEVEL = 3
+
+# Reuse a signed GitHub App JWT for 9 of its 10 minutes of validity
+JWT_REUSE_SECONDS = 9 * 60
+
+# Per-credentials locks serializing installation token refreshes, so concurrent
+# callers mint only once without waiting on other Apps' refreshes
+_TOKEN_LOCKS: dict[tuple[str, str, str], threading.Lock] = collections.defaultdict(
+    threading.Lock
+)
+
+# GitHub App credential fields, each a string or a secretRef in the input
+GITHUB_APP_FIELDS = ("appId", "installationId", "privateKey")
+
+# How long resolved secret values are reused before being read again
+SECRET_TTL_SECONDS = int(os.environ.get("SECRET_TTL_SECONDS", "300"))
+
+# (namespace, name) -> (secret data, expiry on the monotonic clock)
+_SECRET_CACHE: dict[tuple[str, str], tuple[dict[str, str], float]] = {}
+# Per-secret locks, so concurrent lookups of one secret read it only once
+_SECRET_LOCKS: dict[tuple[str, str], threading.Lock] = collections.defaultdict(
+    threading.Lock
+)
+
+
+@functools.cache
+def _get_core_v1() -> "client.CoreV1Api":
+    """Load the Kubernetes config once and return a shared CoreV1Api client."""
+    from kubernetes import client, config
+
+    try:
+        config.load_incluster_config()
+    except config.ConfigException:
+        # Fallback to local config for development
+        config.load_kube_config()
+    return client.CoreV1Api()
+
 
 def resolve_secret_value(secret_ref: dict, logger) -> str | None:
     """Resolve a Kubernetes secret reference to its actual value.
-    
+
+    Secrets are cached whole for SECRET_TTL_SECONDS, so several keys of one
+    secret and repeated requests cost a single API server read, while rotated
+    secrets are still picked up.
+
     Args:
         secret_ref: Dictionary with 'name', 'namespace', and 'key' fields
         logger: Logger instance
@@ -36,16 +157,9 @@ def resolve_secret_value(secret_ref: dict, logger) -> str | None:
     Returns:
         The secret value as a string, or None if not found
     """
+    from kubernetes.client.rest import ApiException
+
     try:
-        # Load Kubernetes config (in-cluster config for function pods)
-        try:
-            config.load_incluster_config()
-        except config.ConfigException:
-            # Fallback to local config for development
-            config.load_kube_config()
-            
-        v1 = client.CoreV1Api()
-        
         name = secret_ref.get("name")
         namespace = secret_ref.get("namespace", "default")
         key = secret_ref.get("key")
@@ -53,18 +167,30 @@ def resolve_secret_value(secret_ref: dict, logger) -> str | None:
         if not all([name, key]):
             logger.error(f"Invalid secret reference: {secret_ref}")
             return None
-            
-        logger.info(f"Resolving secret {namespace}/{name} key {key}")
-        
-        # Get the secret
-        secret = v1.read_namespaced_secret(name=name, namespace=namespace)
-        
-        if key not in secret.data:
+
+        cache_key = (namespace, name)
+        with _SECRET_LOCKS[cache_key]:
+            cached = _SECRET_CACHE.get(cache_key)
+            if cached and time.monotonic() < cached[1]:
+                data = cached[0]
+            else:
+                v1 = _get_core_v1()
+                logger.info(f"Resolving secret {namespace}/{name} key {key}")
+
+                # Get the secret
+                secret = v1.read_namespaced_secret(
+                    name=name, namespace=namespace, _request_timeout=REQUEST_TIMEOUT
+                )
+                data = secret.data or {}
+                expires_at = time.monotonic() + SECRET_TTL_SECONDS
+                _SECRET_CACHE[cache_key] = (data, expires_at)
+
+        if key not in data:
             logger.error(f"Key '{key}' not found in secret {namespace}/{name}")
             return None
             
         # Decode from base64
-        value = base64.b64decode(secret.data[key]).decode('utf-8')
+        value = base64.b64decode(data[key]).decode("utf-8")
         logger.info(f"Successfully resolved secret {namespace}/{name} key {key}")
         return value
         
@@ -86,7 +212,7 @@ def resolve_credential_value(cred_value, logger) -> str | None:
     Returns:
         The resolved credential value as a string
     """
-    if isinstance(cred_value, str):
+    if type(cred_value) is str:
         # Direct string value
         return cred_value
     elif isinstance(cred_value, dict) and "secretRef" in cred_value:
@@ -97,6 +223,384 @@ def resolve_credential_value(cred_value, logger) -> str | None:
         return None
 
 
+async def _resolve_credential(cred_value, logger) -> str | None:
+    """Resolve a credential value without blocking the event loop.
+
+    Direct strings are returned as is; secret references are resolved in a
+    worker thread, since reading secrets uses the blocking Kubernetes client.
+    """
+    if type(cred_value) is str:
+        return cred_value
+    return await asyncio.to_thread(resolve_credential_value, cred_value, logger)
+
+
+class FileSpec(NamedTuple):
+    """A file to commit, as given in the function input."""
+
+    repository: str | None
+    path: str | None
+    content: str | None
+    commit_message: str | None
+    branch: str
+    content_encoding: str = "utf8"
+
+
+class FunctionInput(NamedTuple):
+    """The fields of the function input this function reads."""
+
+    github_token: Any
+    github_app: Any
+    files: list[FileSpec]
+
+
+def _get_string(fields, key: str) -> str | None:
+    """Return a string field of a protobuf Struct, or None if it is not set."""
+    if key not in fields:
+        return None
+    value = fields[key]
+    if value.WhichOneof("kind") != "string_value":
+        return None
+    return value.string_value
+
+
+def _get_value(fields, key: str) -> Any:
+    """Return a protobuf Struct field as a Python value, or None if not set."""
+    if key not in fields:
+        return None
+    return json_format.MessageToDict(fields[key])
+
+
+def _extract_input(input_struct: struct_pb2.Struct) -> FunctionInput:
+    """Read the fields this function uses straight from the input Struct.
+
+    Converting the whole input with MessageToDict would copy every file's
+    content into an intermediate dict; only the credentials are converted,
+    and files are read field by field.
+
+    Args:
+        input_struct: The function input
+
+    Returns:
+        FunctionInput: Raw credentials and file specifications
+    """
+    fields = input_struct.fields
+
+    files = []
+    if "files" in fields:
+        for value in fields["files"].list_value.values:
+            file_fields = value.struct_value.fields
+            files.append(
+                FileSpec(
+                    repository=_get_string(file_fields, "repository"),
+                    path=_get_string(file_fields, "path"),
+                    content=_get_string(file_fields, "content"),
+                    commit_message=_get_string(file_fields, "commitMessage"),
+                    branch=_get_string(file_fields, "branch") or "main",
+                    content_encoding=(
+                        _get_string(file_fields, "contentEncoding") or "utf8"
+                    ),
+                )
+            )
+
+    return FunctionInput(
+        github_token=_get_value(fields, "githubToken"),
+        github_app=_get_value(fields, "githubApp"),
+        files=files,
+    )
+
+
+# Input names of the required file fields, and a getter for their values
+_REQUIRED_FILE_FIELDS = ("repository", "path", "content", "commitMessage")
+_get_required_file_fields = operator.attrgetter(
+    "repository", "path", "content", "commit_message"
+)
+
+
+def _validate_file_spec(file_spec: FileSpec) -> str | None:
+    """Return why a file specification cannot be committed, or None if valid."""
+    values = _get_required_file_fields(file_spec)
+    if not all(values):
+        missing = ", ".join(
+            name
+            for name, value in zip(_REQUIRED_FILE_FIELDS, values, strict=True)
+            if not value
+        )
+        return f"Missing required fields for file {file_spec.path}: {missing}"
+    if file_spec.content_encoding not in INPUT_CONTENT_ENCODINGS:
+        return (
+            f"Unsupported contentEncoding {file_spec.content_encoding!r} "
+            f"for file {file_spec.path}"
+        )
+    return None
+
+
+def _plan_commits(
+    files: list[FileSpec],
+) -> tuple[
+    list[dict | BaseException | None], dict[tuple[str, str], list[int]], dict[int, int]
+]:
+    """Validate files and group them into one commit per repository and branch.
+
+    Identical entries (same repository, path, branch and content) are only
+    committed once; later copies are mapped to the first one. Entries asking
+    for different content at the same path are ambiguous, so none of them is
+    committed and each gets an error.
+
+    Args:
+        files: File specifications from the function input
+
+    Returns:
+        tuple: Per-file outcomes holding validation errors, indices of the
+            files to commit per (repository, branch), and the index of the
+            committed copy for each duplicate
+    """
+    outcomes: list[dict | BaseException | None] = [None] * len(files)
+    groups: dict[tuple[str, str], list[int]] = {}
+    unique: dict[tuple[str, str, str], int] = {}
+    duplicates: dict[int, int] = {}
+    # Distinct contents requested for each target file
+    contents: dict[tuple[str, str, str], set[tuple[str, bytes]]] = {}
+
+    valid = []
+    for i, file_spec in enumerate(files):
+        error_msg = _validate_file_spec(file_spec)
+        if error_msg:
+            outcomes[i] = ValueError(error_msg)
+            continue
+        target = (file_spec.repository, file_spec.branch, file_spec.path)
+        contents.setdefault(target, set()).add(
+            (
+                file_spec.content_encoding,
+                hashlib.sha256(file_spec.content.encode()).digest(),
+            )
+        )
+        valid.append((i, target))
+
+    for i, target in valid:
+        repository, branch, path = target
+        if len(contents[target]) > 1:
+            outcomes[i] = ValueError(
+                f"Conflicting content for file {path} in {repository}/{branch}"
+            )
+            continue
+
+        # Commit identical entries once and replay the result
+        if target in unique:
+            duplicates[i] = unique[target]
+            continue
+        unique[target] = i
+
+        groups.setdefault((repository, branch), []).append(i)
+
+    return outcomes, groups, duplicates
+
+
+def _encode_content(
+    content: str | bytes, content_encoding: ContentEncoding = "utf8"
+) -> str:
+    """Base64-encode file content for the GitHub API.
+
+    Runs in the worker thread committing the file, so large files do not
+    stall the event loop. Uses the SIMD-accelerated pybase64, which produces
+    the same output as the stdlib several times faster. Content that is
+    already base64 is passed through untouched.
+    """
+    if content_encoding == "base64":
+        return content
+    content_bytes = content if content_encoding == "raw" else content.encode()
+    return pybase64.b64encode(content_bytes).decode("ascii")
+
+
+def _git_blob_sha(
+    content: str | bytes, content_encoding: ContentEncoding = "utf8"
+) -> str:
+    """Return the SHA Git assigns to a blob holding this content."""
+    if content_encoding == "base64":
+        content_bytes = pybase64.b64decode(content)
+    elif content_encoding == "raw":
+        content_bytes = content
+    else:
+        content_bytes = content.encode()
+    header = b"blob " + str(len(content_bytes)).encode() + b"\x00"
+    return hashlib.sha1(header + content_bytes, usedforsecurity=False).hexdigest()
+
+
+def _branch_files_query(file_count: int) -> str:
+    """Build a GraphQL query for a branch head and the blobs of some files.
+
+    File N is looked up through the "<branch>:<path>" expression in variable
+    $fileN, and its blob oid is returned under the alias fileN (null when the
+    file does not exist).
+    """
+    variables = "".join(f", $file{i}: String!" for i in range(file_count))
+    objects = "".join(
+        f"    file{i}: object(expression: $file{i}) {{ ... on Blob {{ oid }} }}\n"
+        for i in range(file_count)
+    )
+    return (
+        f"query ($owner: String!, $name: String!, $ref: String!{variables}) {{\n"
+        "  repository(owner: $owner, name: $name) {\n"
+        "    ref(qualifiedName: $ref) { target { oid } }\n"
+        f"{objects}"
+        "  }\n"
+        "}\n"
+    )
+
+
+def _credentials_key(github_token_raw: Any, github_app_raw: Any) -> str:
+    """Return a stable hash of the credential input, used to cache clients."""
+    raw = json.dumps([github_token_raw, github_app_raw], sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _is_sha_rejected(response: requests.Response) -> bool:
+    """Check whether GitHub rejected a PUT for a missing or stale file SHA.
+
+    A 409 from the Contents API always means the SHA no longer matches the
+    file ("<path> does not match <sha>"); a 422 also covers other invalid
+    input, so it only counts when the body mentions the SHA.
+    """
+    if response.status_code == HTTP_CONFLICT:
+        return True
+    return response.status_code == HTTP_UNPROCESSABLE_ENTITY and "sha" in response.text
+
+
+class TokenBucket:
+    """Thread-safe token bucket pacing requests to the GitHub API.
+
+    The rate adapts to GitHub's X-RateLimit-Remaining and X-RateLimit-Reset
+    headers: when few requests remain in the window, the remainder is spread
+    evenly until it resets instead of running into 429s.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+        """
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        # When the rate was lowered for a nearly spent window, its reset time
+        self.reset: float | None = None
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take a token, sleeping until one is available.
+
+        Raises:
+            requests.RequestException: If no token would be available within
+                RATE_LIMIT_MAX_WAIT seconds
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.last) * self.rate
+            )
+            self.last = now
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            if wait > RATE_LIMIT_MAX_WAIT:
+                reset = self.reset if self.reset is not None else time.time() + wait
+                until = datetime.datetime.fromtimestamp(reset, tz=datetime.UTC)
+                msg = f"GitHub rate limit exhausted until {until.isoformat()}"
+                raise requests.RequestException(msg)
+            # Reserve the token now; waiters queue up behind each other
+            self.tokens -= 1
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def observe(self, headers) -> None:
+        """Adjust the rate from GitHub's rate limit response headers."""
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset = int(headers["X-RateLimit-Reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        with self._lock:
+            if remaining < RATE_LIMIT_LOW_REMAINING:
+                window = max(reset - time.time(), 1.0)
+                self.rate = max(remaining, 1) / window
+                self.tokens = min(self.tokens, remaining)
+                self.reset = reset
+            else:
+                self.rate = self.base_rate
+                self.reset = None
+
+
+@functools.lru_cache(maxsize=AUTH_HEADERS_CACHE_SIZE)
+def _auth_headers_for(access_token: str) -> Mapping[str, str]:
+    """Return the read-only request headers for an access token.
+
+    Clients using the same token share one mapping, which callers copy
+    before adding headers.
+    """
+    return types.MappingProxyType(
+        {**DEFAULT_HEADERS, "Authorization": f"token {access_token}"}
+    )
+
+
+@functools.cache
+def _shared_pool_manager(
+    connections: int,
+    maxsize: int,
+    block: bool,  # noqa: FBT001
+) -> PoolManager:
+    """Return the process-wide urllib3 pool used by every GitHub client."""
+    return PoolManager(num_pools=connections, maxsize=maxsize, block=block)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that paces every request through a TokenBucket.
+
+    All adapters share one connection pool, so clients for different
+    credentials reuse the same TLS connections to api.github.com.
+    """
+
+    def __init__(self, bucket: TokenBucket, **kwargs):
+        """Initialize the adapter.
+
+        Args:
+            bucket: Token bucket shared by all requests of a client
+            **kwargs: Passed to HTTPAdapter
+        """
+        self.bucket = bucket
+        super().__init__(**kwargs)
+
+    def init_poolmanager(
+        self,
+        connections,
+        maxsize,
+        block=False,  # noqa: FBT002
+        **pool_kwargs,
+    ):
+        """Attach the shared pool instead of creating one per adapter."""
+        if pool_kwargs:
+            super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+            return
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _shared_pool_manager(connections, maxsize, block)
+
+    def close(self) -> None:
+        """Close proxy pools, leaving the shared pool open for other clients."""
+        for proxy in self.proxy_manager.values():
+            proxy.clear()
+
+    def send(self, request, **kwargs) -> requests.Response:
+        """Wait for a token, send the request and record the rate limit."""
+        self.bucket.acquire()
+        response = super().send(request, **kwargs)
+        self.bucket.observe(response.headers)
+        return response
+
+
 class GitHubFileManager:
     """GitHub API client for file operations."""
 
@@ -105,6 +609,9 @@ class GitHubFileManager:
         logger,
         github_token: str | None = None,
         github_app: dict | None = None,
+        token_cache: dict[tuple[str, str, str], tuple[str, float]] | None = None,
+        *,
+        compress_uploads: bool = False,
     ):
         """Initialize with GitHub authentication and logger.
 
@@ -113,12 +620,31 @@ class GitHubFileManager:
             github_token: GitHub personal access token (optional)
             github_app: GitHub App credentials dict with appId,
                         installationId, privateKey (optional)
+            token_cache: Installation access tokens and their expiry keyed by
+                         app ID, installation ID and private key hash,
+                         shared between managers (optional)
+            compress_uploads: Gzip large file upload bodies (default: False)
         """
         self.logger = logger
         self.github_token = github_token
         self.github_app = github_app
-        self.access_token = None
-        self.token_expires_at = None
+        self.token_cache = token_cache if token_cache is not None else {}
+        self.compress_uploads = compress_uploads
+        self._signing_key = None
+        self._jwt_token = None
+        self._jwt_expires_at = 0.0
+        # Cached tokens are only handed to managers holding the same App
+        # credentials, never to any input that merely names the installation
+        self._token_cache_key = None
+        if github_app:
+            self._token_cache_key = (
+                str(github_app["appId"]),
+                str(github_app["installationId"]),
+                hashlib.sha256(str(github_app["privateKey"]).encode()).hexdigest(),
+            )
+
+        # (repository, path, branch) -> (ETag, blob SHA) of the last known file state
+        self._etag_cache: dict[tuple[str, str, str], tuple[str | None, str]] = {}
 
         # Validate authentication
         if not github_token and not github_app:
@@ -132,18 +658,69 @@ class GitHubFileManager:
             )
             raise ValueError(msg)
 
-        # Initialize headers
-        self.headers = {
-            "Accept": "application/vnd.github.v3+json",
-            "User-Agent": "Crossplane-GitHub-Function",
-        }
+        self.headers = DEFAULT_HEADERS
+
+        # Reuse pooled connections across calls and clients to avoid a TLS
+        # handshake per request
+        self.session = requests.Session()
+        retry = Retry(
+            total=RETRY_TOTAL,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=RETRY_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.bucket = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+        adapter = RateLimitedAdapter(
+            self.bucket,
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=retry,
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
+
+    def close(self) -> None:
+        """Release the session; the shared GitHub connection pool stays open."""
+        self.session.close()
+
+    def __enter__(self) -> "GitHubFileManager":
+        """Return the manager for use as a context manager."""
+        return self
+
+    def __exit__(self, *_) -> None:
+        """Close the session when leaving the context."""
+        self.close()
+
+    def _get_signing_key(self):
+        """Return the GitHub App private key, parsing the PEM only once.
+
+        PyJWT accepts the parsed key and skips loading the PEM on every
+        signature, which is slow for large RSA keys.
+        """
+        if self._signing_key is None:
+            from cryptography.hazmat.primitives.serialization import (
+                load_pem_private_key,
+            )
+
+            self._signing_key = load_pem_private_key(
+                self.github_app["privateKey"].encode(), password=None
+            )
+        return self._signing_key
 
     def _generate_jwt_token(self) -> str:
-        """Generate a JWT token for GitHub App authentication."""
+        """Generate a JWT token for GitHub App authentication.
+
+        The signed token is reused until shortly before it expires.
+        """
         if not self.github_app:
             msg = "GitHub App credentials not provided"
             raise ValueError(msg)
 
+        if self._jwt_token and time.time() < self._jwt_expires_at:
+            return self._jwt_token
+
         # JWT payload
         now = int(time.time())
         payload = {
@@ -153,125 +730,149 @@ class GitHubFileManager:
         }
 
         # Generate JWT token using the private key
+        import jwt
+
         jwt_token = jwt.encode(
             payload,
-            self.github_app["privateKey"],
+            self._get_signing_key(),
             algorithm="RS256",
         )
+        self._jwt_token = jwt_token
+        self._jwt_expires_at = now + JWT_REUSE_SECONDS
         return jwt_token
 
     def _get_installation_access_token(self) -> str:
-        """Get an installation access token using GitHub App authentication."""
+        """Get an installation access token using GitHub App authentication.
+
+        Tokens are cached per App credentials in the shared token cache, so
+        managers created for later requests reuse them until near expiry.
+        Valid cached tokens are returned without taking the refresh lock.
+        """
         if not self.github_app:
             msg = "GitHub App credentials not provided"
             raise ValueError(msg)
 
-        # Check if we have a valid token
-        if (
-            self.access_token
-            and self.token_expires_at
-            and time.time() < self.token_expires_at
-        ):
-            return self.access_token
-
-        jwt_token = self._generate_jwt_token()
         installation_id = self.github_app["installationId"]
-        url = f"https://api.github.com/app/installations/{installation_id}/access_tokens"
-
-        headers = {
-            "Authorization": f"Bearer {jwt_token}",
-            "Accept": "application/vnd.github.v3+json",
-        }
+        cache_key = self._token_cache_key
+
+        cached = self.token_cache.get(cache_key)
+        if cached and time.time() < cached[1]:
+            return cached[0]
+
+        with _TOKEN_LOCKS[cache_key]:
+            # Another thread may have refreshed the token while we waited
+            cached = self.token_cache.get(cache_key)
+            if cached and time.time() < cached[1]:
+                return cached[0]
+
+            jwt_token = self._generate_jwt_token()
+            url = (
+                "https://api.github.com/app/installations/"
+                f"{installation_id}/access_tokens"
+            )
 
-        self.logger.info(
-            f"Getting installation access token for installation {installation_id}"
-        )
-        response = requests.post(url, headers=headers, timeout=REQUEST_TIMEOUT)
+            headers = {
+                "Authorization": f"Bearer {jwt_token}",
+                "Accept": "application/vnd.github.v3+json",
+            }
 
-        if response.status_code != HTTP_CREATED:
-            error_msg = (
-                f"Failed to get installation access token: "
-                f"{response.status_code} - {response.text}"
+            self.logger.info(
+                f"Getting installation access token for installation {installation_id}"
             )
-            self.logger.error(error_msg)
-            raise requests.RequestException(error_msg)
+            response = self.session.post(url, headers=headers, timeout=REQUEST_TIMEOUT)
 
-        token_data = response.json()
-        self.access_token = token_data["token"]
+            if response.status_code != HTTP_CREATED:
+                error_msg = (
+                    f"Failed to get installation access token: "
+                    f"{response.status_code} - {response.text}"
+                )
+                self.logger.error(error_msg)
+                raise requests.RequestException(error_msg, response=response)
 
-        # Parse expiration time (subtract 5 minutes for safety)
-        import datetime
+            token_data = response.json()
+            access_token = token_data["token"]
 
-        expires_at = datetime.datetime.fromisoformat(
-            token_data["expires_at"].replace("Z", "+00:00")
-        )
-        self.token_expires_at = expires_at.timestamp() - (5 * 60)
+            # Parse expiration time (subtract 5 minutes for safety)
+            expires_at = datetime.datetime.fromisoformat(
+                token_data["expires_at"].replace("Z", "+00:00")
+            )
+            self.token_cache[cache_key] = (
+                access_token,
+                expires_at.timestamp() - (5 * 60),
+            )
 
-        self.logger.info(
-            f"Successfully obtained installation access token "
-            f"(expires at {token_data['expires_at']})"
-        )
-        return self.access_token
+            self.logger.info(
+                f"Successfully obtained installation access token "
+                f"(expires at {token_data['expires_at']})"
+            )
+            return access_token
 
-    def _get_auth_headers(self) -> dict:
-        """Get authentication headers based on configured method."""
-        headers = self.headers.copy()
+    def _get_auth_headers(self) -> Mapping[str, str]:
+        """Get authentication headers based on configured method.
 
+        The headers are built once per access token and shared, read-only,
+        between requests and clients.
+        """
         if self.github_token:
-            headers["Authorization"] = f"token {self.github_token}"
+            access_token = self.github_token
         elif self.github_app:
             access_token = self._get_installation_access_token()
-            headers["Authorization"] = f"token {access_token}"
         else:
             msg = "No authentication method configured"
             raise ValueError(msg)
 
-        return headers
+        return _auth_headers_for(access_token)
 
-    def commit_file(
+    def _get_current_sha(
         self,
-        repository: str,
-        path: str,
-        content: str,
-        message: str,
-        branch: str = "main",
-    ) -> dict:
-        """Commit a file to a GitHub repository.
+        url: str,
+        cache_key: tuple[str, str, str],
+        auth_headers: Mapping[str, str],
+    ) -> str | None:
+        """Get the blob SHA of an existing file, or None if it does not exist.
+
+        Always asks GitHub. A cached ETag is sent as If-None-Match, so an
+        unchanged file costs a 304 that does not count against the rate limit.
 
         Args:
-            repository: GitHub repository in format "owner/repo"
-            path: File path within repository
-            content: File content as string
-            message: Commit message
-            branch: Target branch (default: main)
+            url: Contents API URL of the file
+            cache_key: (repository, path, branch) of the file
+            auth_headers: Authentication headers for the request
 
         Returns:
-            dict: GitHub API response with commit info
-
-        Raises:
-            requests.RequestException: If GitHub API request fails
+            The current blob SHA, or None if the file does not exist
         """
-        url = f"https://api.github.com/repos/{repository}/contents/{path}"
-        auth_headers = self._get_auth_headers()
+        path = cache_key[1]
+        cached = self._etag_cache.get(cache_key)
 
-        # Encode content as base64
-        encoded_content = base64.b64encode(content.encode()).decode("ascii")
+        headers = auth_headers
+        if cached and cached[0]:
+            headers = {**auth_headers, "If-None-Match": cached[0]}
 
-        # Check if file exists to get SHA for update
         current_sha = None
         try:
-            get_response = requests.get(
+            get_response = self.session.get(
                 url,
-                headers=auth_headers,
-                params={"ref": branch},
+                headers=headers,
+                params={"ref": cache_key[2]},
                 timeout=REQUEST_TIMEOUT,
             )
-            if get_response.status_code == HTTP_OK:
+            if get_response.status_code == HTTP_NOT_MODIFIED:
+                current_sha = cached[1]
+                self.logger.info(
+                    f"File {path} unchanged, will update with SHA: {current_sha}"
+                )
+            elif get_response.status_code == HTTP_OK:
                 current_sha = get_response.json().get("sha")
+                self._etag_cache[cache_key] = (
+                    get_response.headers.get("ETag"),
+                    current_sha,
+                )
                 self.logger.info(
                     f"File {path} exists, will update with SHA: {current_sha}"
                 )
             elif get_response.status_code == HTTP_NOT_FOUND:
+                self._etag_cache.pop(cache_key, None)
                 self.logger.info(f"File {path} does not exist, will create new file")
             else:
                 self.logger.warning(
@@ -281,6 +882,119 @@ class GitHubFileManager:
         except Exception as e:
             self.logger.warning(f"Error checking file existence: {e}")
 
+        return current_sha
+
+    def _put_contents(
+        self, url: str, commit_data: dict, auth_headers: Mapping[str, str]
+    ) -> requests.Response:
+        """Send a Contents API PUT to create or update a file.
+
+        The body is serialized with orjson, which is much faster than the
+        stdlib encoder requests uses for json= on multi-megabyte content.
+        With compress_uploads, large bodies are sent gzip-compressed.
+        """
+        body = orjson.dumps(commit_data)
+        headers = {**auth_headers, "Content-Type": "application/json"}
+        if self.compress_uploads and len(body) > COMPRESS_MIN_BYTES:
+            body = gzip.compress(body, compresslevel=COMPRESS_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+        return self.session.put(
+            url,
+            data=body,
+            headers=headers,
+            timeout=REQUEST_TIMEOUT,
+        )
+
+    def _known_sha(
+        self,
+        url: str,
+        cache_key: tuple[str, str, str],
+        auth_headers: Mapping[str, str],
+        *,
+        fast_path: bool,
+        expected_sha: str | None,
+    ) -> tuple[str | None, bool]:
+        """Return the SHA to update a file from, and whether GitHub reported it.
+
+        The caller's expected_sha and cached SHAs are used without a request.
+        GitHub is only asked without fast_path, when no SHA from our own last
+        commit is cached.
+        """
+        if expected_sha:
+            return expected_sha, False
+        cached = self._etag_cache.get(cache_key)
+        if fast_path or (cached and cached[0] is None):
+            # Let GitHub tell us whether a SHA is needed instead of asking
+            # first; a SHA cached from our own last commit needs no check
+            return (cached[1] if cached else None), False
+        # Check if file exists to get SHA for update
+        return self._get_current_sha(url, cache_key, auth_headers), True
+
+    def commit_file(  # noqa: PLR0913
+        self,
+        repository: str,
+        path: str,
+        content: str | bytes,
+        message: str,
+        branch: str = "main",
+        *,
+        fast_path: bool = True,
+        content_encoding: ContentEncoding = "utf8",
+        expected_sha: str | None = None,
+    ) -> dict:
+        """Commit a file to a GitHub repository.
+
+        With fast_path, the PUT is sent straight away using the cached SHA (if
+        any). Only when GitHub answers that a SHA is missing or stale is the
+        file's current SHA fetched and the PUT retried, so new files and files
+        we committed earlier take a single round-trip. Without fast_path the
+        existence check always runs before the PUT. A caller that knows the
+        file's SHA can pass it as expected_sha to skip the check entirely.
+
+        When GitHub reports a blob SHA for the file that matches the Git blob
+        SHA of the content, the file is already up to date and no commit is
+        made. A matching SHA from the cache or expected_sha is confirmed with
+        GitHub first, since the file may have changed on the branch since.
+
+        Args:
+            repository: GitHub repository in format "owner/repo"
+            path: File path within repository
+            content: File content, as text or bytes per content_encoding
+            message: Commit message
+            branch: Target branch (default: main)
+            fast_path: Attempt the PUT before checking file existence
+            content_encoding: "utf8" for text, "base64" for text that is
+                              already base64, "raw" for bytes (default: utf8)
+            expected_sha: Known blob SHA of the file on the branch (optional)
+
+        Returns:
+            dict: GitHub API response with commit info
+
+        Raises:
+            requests.RequestException: If GitHub API request fails
+        """
+        url = f"https://api.github.com/repos/{repository}/contents/{path}"
+        auth_headers = self._get_auth_headers()
+
+        github_url = f"https://github.com/{repository}/blob/{branch}/{path}"
+
+        cache_key = (repository, path, branch)
+        current_sha, confirmed = self._known_sha(
+            url, cache_key, auth_headers, fast_path=fast_path, expected_sha=expected_sha
+        )
+
+        blob_sha = _git_blob_sha(content, content_encoding)
+        if current_sha == blob_sha:
+            # The file may have changed on the branch since the SHA was cached
+            # or supplied, so only skip on a SHA GitHub has just reported
+            if not confirmed:
+                current_sha = self._get_current_sha(url, cache_key, auth_headers)
+            if current_sha == blob_sha:
+                return self._unchanged_result(path, current_sha, github_url)
+
+        # Encode content as base64
+        encoded_content = _encode_content(content, content_encoding)
+
         # Prepare commit data
         commit_data = {
             "message": message,
@@ -293,23 +1007,33 @@ class GitHubFileManager:
 
         # Commit the file
         self.logger.info(f"Committing file {path} to {repository}/{branch}")
-        commit_response = requests.put(
-            url,
-            json=commit_data,
-            headers=auth_headers,
-            timeout=REQUEST_TIMEOUT,
-        )
+        commit_response = self._put_contents(url, commit_data, auth_headers)
+
+        if fast_path and _is_sha_rejected(commit_response):
+            self.logger.info(f"File {path} needs its current SHA, checking existence")
+            self._etag_cache.pop(cache_key, None)
+            current_sha = self._get_current_sha(url, cache_key, auth_headers)
+            if current_sha == blob_sha:
+                return self._unchanged_result(path, current_sha, github_url)
+            commit_data = {
+                key: value for key, value in commit_data.items() if key != "sha"
+            }
+            if current_sha:
+                commit_data["sha"] = current_sha
+            commit_response = self._put_contents(url, commit_data, auth_headers)
 
         if commit_response.status_code in [HTTP_OK, HTTP_CREATED]:
             result = commit_response.json()
             self.logger.info(
                 f"Successfully committed {path} with SHA: {result['content']['sha']}"
             )
+            # Remember the new SHA so the next commit to this path skips the GET
+            self._etag_cache[cache_key] = (None, result["content"]["sha"])
             return {
                 "success": True,
                 "path": path,
                 "sha": result["content"]["sha"],
-                "githubUrl": f"https://github.com/{repository}/blob/{branch}/{path}",
+                "githubUrl": github_url,
             }
         else:
             error_msg = (
@@ -317,8 +1041,204 @@ class GitHubFileManager:
                 f"{commit_response.status_code} - {commit_response.text}"
             )
             self.logger.error(error_msg)
+            # The cached SHA may be stale; probe the file again next time
+            self._etag_cache.pop(cache_key, None)
+            raise requests.RequestException(error_msg, response=commit_response)
+
+    def _unchanged_result(self, path: str, sha: str, github_url: str) -> dict:
+        """Build the result for a file whose content is already on the branch."""
+        self.logger.info(f"File {path} is unchanged, skipping commit")
+        return {
+            "success": True,
+            "path": path,
+            "sha": sha,
+            "githubUrl": github_url,
+            "skipped": True,
+        }
+
+    def _check_response(
+        self, response: requests.Response, expected_status: int, action: str
+    ) -> dict:
+        """Return the JSON body of a response, raising if its status is unexpected.
+
+        Args:
+            response: GitHub API response
+            expected_status: Status code indicating success
+            action: Description of the request for error messages
+
+        Returns:
+            dict: Parsed JSON response body
+
+        Raises:
+            requests.RequestException: If the status code is unexpected
+        """
+        if response.status_code != expected_status:
+            error_msg = f"Failed to {action}: {response.status_code} - {response.text}"
+            self.logger.error(error_msg)
+            raise requests.RequestException(error_msg, response=response)
+        return response.json()
+
+    def commit_files_graphql(
+        self,
+        repository: str,
+        branch: str,
+        files: list[dict],
+        message: str,
+    ) -> list[dict]:
+        """Commit several files to a branch with one GraphQL mutation.
+
+        Uses createCommitOnBranch, which takes every file in a single request,
+        so a commit costs two requests whatever the number of files: a query
+        for the branch head and the current blob of each file, then the
+        mutation. Files whose blob already matches the Git blob SHA of their
+        content are skipped, and no commit is made when every file is
+        unchanged.
+
+        Args:
+            repository: GitHub repository in format "owner/repo"
+            branch: Target branch
+            files: Files to commit, each a dict with "path", "content" and
+                   optionally "content_encoding" (default: utf8)
+            message: Commit message; its first line becomes the headline
+
+        Returns:
+            list: Commit info for each file, in input order
+
+        Raises:
+            requests.RequestException: If any GitHub API request fails
+        """
+        auth_headers = self._get_auth_headers()
+
+        # The mutation only applies on top of the head we expect
+        owner, _, name = repository.partition("/")
+        variables = {"owner": owner, "name": name, "ref": f"refs/heads/{branch}"}
+        for index, file in enumerate(files):
+            variables[f"file{index}"] = f"{branch}:{file['path']}"
+        data = self._graphql(
+            _branch_files_query(len(files)),
+            variables,
+            auth_headers,
+            f"get {branch} files",
+        )
+        repository_data = data["repository"]
+        if not repository_data["ref"]:
+            error_msg = f"Failed to get {branch} ref: branch not found"
+            self.logger.error(error_msg)
             raise requests.RequestException(error_msg)
 
+        # Files whose blob on the branch already matches need no change
+        results: list[dict | None] = [None] * len(files)
+        pending = []
+        blob_shas = []
+        for index, file in enumerate(files):
+            path = file["path"]
+            blob_sha = _git_blob_sha(
+                file["content"], file.get("content_encoding", "utf8")
+            )
+            current = repository_data[f"file{index}"] or {}
+            if current.get("oid") == blob_sha:
+                self._etag_cache[(repository, path, branch)] = (None, blob_sha)
+                results[index] = self._unchanged_result(
+                    path,
+                    blob_sha,
+                    f"https://github.com/{repository}/blob/{branch}/{path}",
+                )
+            else:
+                pending.append(index)
+                blob_shas.append(blob_sha)
+        if not pending:
+            return results
+        changed = [files[index] for index in pending]
+
+        headline, _, body = message.partition("\n")
+        additions = [
+            {
+                "path": file["path"],
+                "contents": _encode_content(
+                    file["content"], file.get("content_encoding", "utf8")
+                ),
+            }
+            for file in changed
+        ]
+
+        commit_input = {
+            "branch": {"repositoryNameWithOwner": repository, "branchName": branch},
+            "message": {"headline": headline, "body": body.strip()},
+            "expectedHeadOid": repository_data["ref"]["target"]["oid"],
+            "fileChanges": {"additions": additions},
+        }
+
+        self.logger.info(f"Committing {len(changed)} files to {repository}/{branch}")
+        self._graphql(
+            CREATE_COMMIT_MUTATION,
+            {"input": commit_input},
+            auth_headers,
+            "create commit",
+        )
+
+        committed = self._committed_results(repository, branch, changed, blob_shas)
+        for index, result in zip(pending, committed, strict=True):
+            results[index] = result
+        return results
+
+    def _graphql(
+        self,
+        query: str,
+        variables: dict,
+        auth_headers: Mapping[str, str],
+        action: str,
+    ) -> dict:
+        """Send a GraphQL request and return its data.
+
+        GitHub reports GraphQL errors in the body of a 200 response, so those
+        are raised like unexpected status codes.
+
+        Args:
+            query: GraphQL query or mutation
+            variables: Values of the query variables
+            auth_headers: Authentication headers for the request
+            action: Description of the request for error messages
+
+        Returns:
+            dict: The "data" member of the response
+
+        Raises:
+            requests.RequestException: If the request fails or returns errors
+        """
+        response = self.session.post(
+            GRAPHQL_URL,
+            data=orjson.dumps({"query": query, "variables": variables}),
+            headers={**auth_headers, "Content-Type": "application/json"},
+            timeout=REQUEST_TIMEOUT,
+        )
+        result = self._check_response(response, HTTP_OK, action)
+        if result.get("errors"):
+            errors = "; ".join(error.get("message", "") for error in result["errors"])
+            error_msg = f"Failed to {action}: {errors}"
+            self.logger.error(error_msg)
+            raise requests.RequestException(error_msg, response=response)
+        return result["data"]
+
+    def _committed_results(
+        self, repository: str, branch: str, files: list[dict], blob_shas: list[str]
+    ) -> list[dict]:
+        """Record the new blob SHAs of committed files and build their results."""
+        results = []
+        for file, sha in zip(files, blob_shas, strict=True):
+            path = file["path"]
+            self._etag_cache[(repository, path, branch)] = (None, sha)
+            results.append(
+                {
+                    "success": True,
+                    "path": path,
+                    "sha": sha,
+                    "githubUrl": (
+                        f"https://github.com/{repository}/blob/{branch}/{path}"
+                    ),
+                }
+            )
+        return results
+
 
 class FunctionRunner:
     """Main function runner for Crossplane composition function."""
@@ -326,8 +1246,230 @@ class FunctionRunner:
     def __init__(self):
         """Initialize the function runner."""
         self.log = logging.get_logger()
+        # Installation access tokens outlive a single request, so share them
+        self._token_cache: dict[tuple[str, str, str], tuple[str, float]] = {}
+        # Credentials hash -> (client, expiry on the monotonic clock)
+        self._client_cache: dict[str, tuple[GitHubFileManager, float]] = {}
+        # Credentials hash -> client being created, shared by concurrent requests
+        self._pending_clients: dict[str, asyncio.Task[GitHubFileManager]] = {}
+        self._client_lock = asyncio.Lock()
+
+    async def _create_manager(
+        self, github_token_raw: Any, github_app_raw: Any
+    ) -> GitHubFileManager:
+        """Resolve credentials from the input and create a GitHub client.
+
+        Secret references are resolved in worker threads, since reading
+        secrets uses the blocking Kubernetes client. The GitHub App fields are
+        resolved concurrently.
+
+        Args:
+            github_token_raw: githubToken input value, a string or secretRef
+            github_app_raw: githubApp input value with appId, installationId
+                            and privateKey, each a string or secretRef
+
+        Returns:
+            GitHubFileManager: Client authenticated with the credentials
+
+        Raises:
+            ValueError: If credentials are missing, ambiguous or unresolvable
+        """
+        log = self.log
+
+        # Resolve credentials (handle secret references)
+        github_token = None
+        github_app = None
+
+        if github_token_raw:
+            github_token = await _resolve_credential(github_token_raw, log)
+            if not github_token:
+                msg = "Failed to resolve GitHub token"
+                raise ValueError(msg)
+
+        if github_app_raw:
+            log.info("Resolving GitHub App credentials...")
+            values = await asyncio.gather(
+                *(
+                    _resolve_credential(github_app_raw.get(field), log)
+                    for field in GITHUB_APP_FIELDS
+                )
+            )
+            github_app = dict(zip(GITHUB_APP_FIELDS, values, strict=True))
+
+            missing = [field for field, value in github_app.items() if not value]
+            if missing:
+                msg = f"Failed to resolve GitHub App credentials: {', '.join(missing)}"
+                raise ValueError(msg)
+
+        # Validate authentication
+        if not github_token and not github_app:
+            msg = "Either githubToken or githubApp authentication must be provided"
+            raise ValueError(msg)
+
+        if github_token and github_app:
+            msg = (
+                "Cannot use both githubToken and githubApp "
+                "authentication simultaneously"
+            )
+            raise ValueError(msg)
 
-    async def RunFunction(  # noqa: PLR0915, C901
+        # Log authentication method
+        if github_token:
+            log.info("Using personal access token authentication")
+        else:
+            app_id = github_app.get("appId")
+            log.info(f"Using GitHub App authentication (App ID: {app_id})")
+
+        return GitHubFileManager(
+            logger=log,
+            github_token=github_token,
+            github_app=github_app,
+            token_cache=self._token_cache,
+            compress_uploads=COMPRESS_UPLOADS,
+        )
+
+    async def _get_manager(
+        self, github_token_raw: Any, github_app_raw: Any
+    ) -> GitHubFileManager:
+        """Return a cached GitHub client for the input credentials.
+
+        Clients are keyed by a hash of the credential input, so steady-state
+        requests skip secret resolution and keep their warm connection pool,
+        SHA cache and tokens. Entries expire after SECRET_TTL_SECONDS so that
+        rotated secrets are resolved again. Credentials are resolved outside
+        the cache lock, so a slow secret read only delays requests using the
+        same credentials, which share a single resolution.
+
+        Args:
+            github_token_raw: githubToken input value
+            github_app_raw: githubApp input value
+
+        Returns:
+            GitHubFileManager: Client authenticated with the credentials
+        """
+        key = _credentials_key(github_token_raw, github_app_raw)
+
+        async with self._client_lock:
+            now = time.monotonic()
+            # Drop expired clients; in-flight requests keep their reference
+            for cached_key, (_, expires_at) in list(self._client_cache.items()):
+                if now >= expires_at:
+                    del self._client_cache[cached_key]
+
+            cached = self._client_cache.get(key)
+            if cached:
+                return cached[0]
+
+            pending = self._pending_clients.get(key)
+            if pending is None:
+                pending = asyncio.create_task(
+                    self._create_manager(github_token_raw, github_app_raw)
+                )
+                self._pending_clients[key] = pending
+
+                def store(task: asyncio.Task[GitHubFileManager]) -> None:
+                    del self._pending_clients[key]
+                    # Failures are not cached; the next request retries
+                    if not task.cancelled() and task.exception() is None:
+                        self._client_cache[key] = (
+                            task.result(),
+                            time.monotonic() + SECRET_TTL_SECONDS,
+                        )
+
+                pending.add_done_callback(store)
+
+        # Shielded so that a cancelled request leaves the others waiting
+        return await asyncio.shield(pending)
+
+    async def _commit_files(
+        self, github_manager: GitHubFileManager, files: list[FileSpec]
+    ) -> tuple[list[dict], list[str]]:
+        """Commit files concurrently, returning results and errors in input order.
+
+        Duplicate entries (same repository, path, branch and content) are
+        committed once and share the result, while entries with conflicting
+        content for the same path fail. All files for a repository and
+        branch are committed together as a single GraphQL commit, whose
+        message joins their distinct commit messages. Each branch thus gets
+        one commit, so no branch is updated concurrently, and at most
+        MAX_CONCURRENT_COMMITS commits are in flight at once.
+
+        Args:
+            github_manager: Client used to commit the files
+            files: File specifications from the function input
+
+        Returns:
+            tuple: Successful commit results and error messages
+        """
+        outcomes, groups, duplicates = _plan_commits(files)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_COMMITS)
+
+        async def commit_group(
+            repository: str, branch: str, indices: list[int]
+        ) -> list[dict]:
+            # dict.fromkeys drops repeated messages but keeps their order
+            message = "\n\n".join(
+                dict.fromkeys(files[i].commit_message for i in indices)
+            )
+            # Commit without blocking the event loop
+            async with semaphore:
+                if len(indices) == 1:
+                    file_spec = files[indices[0]]
+                    result = await asyncio.to_thread(
+                        github_manager.commit_file,
+                        repository=repository,
+                        path=file_spec.path,
+                        content=file_spec.content,
+                        message=message,
+                        branch=branch,
+                        content_encoding=file_spec.content_encoding,
+                    )
+                    return [result]
+
+                return await asyncio.to_thread(
+                    github_manager.commit_files_graphql,
+                    repository=repository,
+                    branch=branch,
+                    files=[
+                        {
+                            "path": files[i].path,
+                            "content": files[i].content,
+                            "content_encoding": files[i].content_encoding,
+                        }
+                        for i in indices
+                    ],
+                    message=message,
+                )
+
+        group_outcomes = await asyncio.gather(
+            *(commit_group(*key, indices) for key, indices in groups.items()),
+            return_exceptions=True,
+        )
+        for indices, outcome in zip(groups.values(), group_outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                for i in indices:
+                    outcomes[i] = outcome
+            else:
+                for i, result in zip(indices, outcome, strict=True):
+                    outcomes[i] = result
+        for i, original in duplicates.items():
+            outcomes[i] = outcomes[original]
+
+        results = []
+        errors = []
+        for i, (file_spec, outcome) in enumerate(zip(files, outcomes, strict=True)):
+            path = file_spec.path or "unknown"
+            if isinstance(outcome, BaseException):
+                error_msg = f"Failed to process file {path}: {outcome!s}"
+                errors.append(error_msg)
+                self.log.error(error_msg)
+            else:
+                results.append(outcome)
+                self.log.info(f"Successfully processed file {i + 1}: {path}")
+
+        return results, errors
+
+    async def RunFunction(
         self, req: fnv1.RunFunctionRequest, _: grpc.aio.ServicerContext
     ) -> fnv1.RunFunctionResponse:
         """Run the GitHub file manager function."""
@@ -343,109 +1485,26 @@ class FunctionRunner:
                 msg = "No input provided"
                 raise ValueError(msg)
 
-            # Convert protobuf struct to dictionary
-            input_dict = json_format.MessageToDict(req.input)
-            log.info(f"Input received: {json.dumps(input_dict, indent=2)}")
-
             # Extract required parameters
-            github_token_raw = input_dict.get("githubToken")
-            github_app_raw = input_dict.get("githubApp")
-            files = input_dict.get("files", [])
-
-            # Resolve credentials (handle secret references)
-            github_token = None
-            github_app = None
-
-            if github_token_raw:
-                github_token = resolve_credential_value(github_token_raw, log)
-                if not github_token:
-                    msg = "Failed to resolve GitHub token"
-                    raise ValueError(msg)
-
-            if github_app_raw:
-                log.info("Resolving GitHub App credentials...")
-                app_id = resolve_credential_value(github_app_raw.get("appId"), log)
-                installation_id = resolve_credential_value(github_app_raw.get("installationId"), log)
-                private_key = resolve_credential_value(github_app_raw.get("privateKey"), log)
-
-                if not all([app_id, installation_id, private_key]):
-                    missing = []
-                    if not app_id: missing.append("appId")
-                    if not installation_id: missing.append("installationId")
-                    if not private_key: missing.append("privateKey")
-                    msg = f"Failed to resolve GitHub App credentials: {', '.join(missing)}"
-                    raise ValueError(msg)
-
-                github_app = {
-                    "appId": app_id,
-                    "installationId": installation_id,
-                    "privateKey": private_key
-                }
+            github_token_raw, github_app_raw, files = _extract_input(req.input)
+
+            # Log only the input's shape: it may hold credentials and large files
+            log.debug(
+                "Input received",
+                file_count=len(files),
+                has_token=bool(github_token_raw),
+                has_app=bool(github_app_raw),
+            )
 
-            # Validate authentication
-            if not github_token and not github_app:
-                msg = "Either githubToken or githubApp authentication must be provided"
-                raise ValueError(msg)
-
-            if github_token and github_app:
-                msg = (
-                    "Cannot use both githubToken and githubApp "
-                    "authentication simultaneously"
-                )
-                raise ValueError(msg)
+            # Reuse the client for these credentials, or resolve them
+            github_manager = await self._get_manager(github_token_raw, github_app_raw)
 
             if not files:
                 msg = "At least one file must be specified"
                 raise ValueError(msg)
 
-            # Log authentication method
-            if github_token:
-                log.info("Using personal access token authentication")
-            else:
-                app_id = github_app.get("appId")
-                log.info(f"Using GitHub App authentication (App ID: {app_id})")
-
-            # Initialize GitHub manager
-            github_manager = GitHubFileManager(
-                logger=log, github_token=github_token, github_app=github_app
-            )
-
             # Process files
-            results = []
-            errors = []
-
-            for i, file_spec in enumerate(files):
-                try:
-                    # Extract file details
-                    repository = file_spec.get("repository")
-                    path = file_spec.get("path")
-                    content = file_spec.get("content")
-                    commit_message = file_spec.get("commitMessage")
-                    branch = file_spec.get("branch", "main")
-
-                    # Validate required fields
-                    if not all([repository, path, content, commit_message]):
-                        msg = f"Missing required fields for file {path}"
-                        raise ValueError(msg)
-
-                    # Commit the file
-                    result = github_manager.commit_file(
-                        repository=repository,
-                        path=path,
-                        content=content,
-                        message=commit_message,
-                        branch=branch,
-                    )
-                    results.append(result)
-                    log.info(f"Successfully processed file {i + 1}: {path}")
-
-                except Exception as e:
-                    error_msg = (
-                        f"Failed to process file {file_spec.get('path', 'unknown')}: "
-                        f"{e!s}"
-                    )
-                    errors.append(error_msg)
-                    log.error(error_msg)
+            results, errors = await self._commit_files(github_manager, files)
 
             # Create context with results
             context = {